@@ -1,5 +1,8 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
+import orjson
+import hashlib
 import joblib
 import pandas as pd
 import numpy as np
@@ -14,7 +17,36 @@ from io import BytesIO
 from PIL import Image
 import traceback
 
+# ---------------------- JSON ----------------------
+# OPT_SORT_KEYS keeps the key order of Flask's default provider (sort_keys=True)
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS
+
+def _orjson_default(obj):
+    # NumPy arrays and scalars are handled natively, this only catches stragglers
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def _reject_json_kwargs(kwargs):
+    if kwargs:
+        raise TypeError(f"Unsupported JSON options: {', '.join(sorted(kwargs))}")
+
+class OrjsonProvider(JSONProvider):
+    def dumps(self, obj, **kwargs):
+        _reject_json_kwargs(kwargs)
+        return orjson.dumps(obj, default=_orjson_default, option=ORJSON_OPTIONS).decode()
+
+    def loads(self, s, **kwargs):
+        _reject_json_kwargs(kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=_orjson_default, option=ORJSON_OPTIONS)
+        return self._app.response_class(body, mimetype="application/json")
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 CORS(app)
 
 print("🔄 Loading models and scalers...")
@@ -73,9 +105,23 @@ def load_suggestion_model_v2():
 
 # ---------------------- DEPRESSION MODULE ----------------------
 depression_model = None
+depression_scaler = None
+
+# "rule" scores the 21 BDI responses only and never calls TensorFlow,
+# "model" additionally returns the depression model's output.
+DEPRESSION_SCORING_MODES = ("rule", "model")
+
+def read_depression_scoring_mode():
+    mode = os.environ.get("DEPRESSION_SCORING_MODE", "rule").lower()
+    if mode not in DEPRESSION_SCORING_MODES:
+        print(f"⚠️  Unknown DEPRESSION_SCORING_MODE '{mode}', falling back to 'rule'")
+        return "rule"
+    return mode
+
+DEPRESSION_SCORING_MODE = read_depression_scoring_mode()
 
 def load_depression_model():
-    global depression_model
+    global depression_model, depression_scaler
     try:
         depression_model = tf_load_model(os.path.join(MODEL_DIR, "depression_model.h5"), compile=False)
         depression_model.compile(optimizer='adam', loss=MeanSquaredError(), metrics=['mse'])
@@ -83,6 +129,13 @@ def load_depression_model():
     except Exception as e:
         print(f"❌ Error loading depression model: {e}")
 
+    # StandardScaler over the 21 BDI responses, saved next to this model
+    try:
+        depression_scaler = joblib.load(os.path.join(MODEL_DIR, "depression_scaler.pkl"))
+        print("✅ Depression scaler loaded.")
+    except Exception as e:
+        print(f"❌ Error loading depression scaler: {e}")
+
 # ---------------------- ANXIETY MODULE ----------------------
 anxiety_model = None
 
@@ -154,6 +207,120 @@ load_anxiety_model()
 load_face_expression_model()
 print("🎯 ALL MODELS LOADING COMPLETED")
 
+# ---------------------- REQUEST SCHEMAS ----------------------
+STRESS_FEATURES = [
+    'anxiety_level', 'self_esteem', 'mental_health_history', 'depression', 
+    'headache', 'blood_pressure', 'sleep_quality', 'breathing_problem', 
+    'noise_level', 'living_conditions', 'safety', 'basic_needs', 
+    'academic_performance', 'study_load', 'teacher_student_relationship', 
+    'future_career_concerns', 'social_support', 'peer_pressure', 
+    'extracurricular_activities', 'bullying'
+]
+
+SUGGESTION_FEATURES = [
+    'depression_level', 'stress_level', 'anxiety_level',
+    'age', 'gender', 'relationship', 'living_situation'
+]
+
+ANXIETY_FEATURES = [
+    "Gender", "Age", "numbness", "wobbliness", "afraidofworsthappening",
+    "heartpounding", "unsteadyorunstable", "terrified", "handstrembling",
+    "shakystate", "difficultyinbreathing", "scared", "hotorcoldsweats", "faceflushed"
+]
+
+BDI_RESPONSE_COUNT = 21
+
+class RequestValidationError(ValueError):
+    """Raised when a request payload does not match its schema, returned as a 400."""
+
+class FeatureSchema:
+    """Named fields of a JSON object coerced into a single (1, n) NumPy row."""
+
+    def __init__(self, fields, dtype):
+        self.fields = tuple(fields)
+        self.dtype = np.dtype(dtype)
+        self.cast = self._to_int if self.dtype.kind in "iu" else self._to_float
+
+    @staticmethod
+    def _to_int(value):
+        # Whole numbers only: integer strings and integral floats, never bool or 1.7
+        if isinstance(value, bool):
+            raise TypeError("bool is not a valid value")
+        if isinstance(value, float):
+            if not value.is_integer():
+                raise ValueError("not a whole number")
+            return int(value)
+        if isinstance(value, (int, str)):
+            return int(value)
+        raise TypeError(f"{type(value).__name__} is not a valid value")
+
+    @staticmethod
+    def _to_float(value):
+        if isinstance(value, bool):
+            raise TypeError("bool is not a valid value")
+        return float(value)
+
+    def parse(self, data):
+        if not isinstance(data, dict):
+            raise RequestValidationError("Expected a JSON object")
+        row = np.empty((1, len(self.fields)), dtype=self.dtype)
+        for i, field in enumerate(self.fields):
+            if field not in data:
+                raise RequestValidationError(f"Missing required field: {field}")
+            try:
+                row[0, i] = self.cast(data[field])
+            except (TypeError, ValueError, OverflowError):
+                raise RequestValidationError(f"Invalid value for field: {field}")
+        finite = np.isfinite(row[0])
+        if not finite.all():
+            field = self.fields[int(np.argmin(finite))]
+            raise RequestValidationError(f"Invalid value for field: {field}")
+        return row
+
+class SequenceSchema:
+    """Fixed-length JSON array of integers in [low, high] under a single key, as a (1, n) NumPy row."""
+
+    def __init__(self, key, length, low, high):
+        self.key = key
+        self.length = length
+        self.low = low
+        self.high = high
+
+    def parse(self, data):
+        if not isinstance(data, dict):
+            raise RequestValidationError("Expected a JSON object")
+        values = data.get(self.key)
+        if not isinstance(values, list) or len(values) != self.length:
+            raise RequestValidationError(f"Expected {self.length} {self.key}.")
+        for value in values:
+            # bool is an int subclass, but true/false is not a valid answer
+            if type(value) is not int or not self.low <= value <= self.high:
+                raise RequestValidationError(
+                    f"Each of {self.key} must be an integer from {self.low} to {self.high}")
+        return np.array([values], dtype=np.int64)
+
+STRESS_SCHEMA = FeatureSchema(STRESS_FEATURES, np.float64)
+SUGGESTION_SCHEMA = FeatureSchema(SUGGESTION_FEATURES, np.int64)
+ANXIETY_SCHEMA = FeatureSchema(ANXIETY_FEATURES, np.float64)
+DEPRESSION_SCHEMA = SequenceSchema("responses", BDI_RESPONSE_COUNT, 0, 3)
+
+def parse_request(schema):
+    data = request.get_json(silent=True)
+    print(f"📦 Received data: {data}")
+    if not data:
+        raise RequestValidationError("No JSON data received")
+    return data, schema.parse(data)
+
+# /features never changes, so encode it once and let clients revalidate with the ETag
+FEATURES_INFO = {
+    'stress_features': STRESS_FEATURES,
+    'suggestion_features': SUGGESTION_FEATURES,
+    'anxiety_features': ANXIETY_FEATURES,
+    'depression_features': f"{BDI_RESPONSE_COUNT} BDI questionnaire responses"
+}
+FEATURES_BODY = orjson.dumps(FEATURES_INFO, option=ORJSON_OPTIONS)
+FEATURES_ETAG = hashlib.sha1(FEATURES_BODY).hexdigest()
+
 # ---------------------- ROUTES ----------------------
 @app.route('/')
 def home():
@@ -186,43 +353,10 @@ def get_model_features():
     print("\n" + "="*50)
     print("📋 FEATURES ENDPOINT CALLED")
     print("="*50)
-    try:
-        print("🔧 Building features info...")
-        features_info = {}
-
-        # Stress Model
-        features_info['stress_features'] = [
-            'anxiety_level', 'self_esteem', 'mental_health_history', 'depression', 
-            'headache', 'blood_pressure', 'sleep_quality', 'breathing_problem', 
-            'noise_level', 'living_conditions', 'safety', 'basic_needs', 
-            'academic_performance', 'study_load', 'teacher_student_relationship', 
-            'future_career_concerns', 'social_support', 'peer_pressure', 
-            'extracurricular_activities', 'bullying'
-        ]
-
-        # Suggestion Model
-        features_info['suggestion_features'] = [
-            'depression_level', 'stress_level', 'anxiety_level',
-            'age', 'gender', 'relationship', 'living_situation'
-        ]
-
-        # Anxiety Model
-        features_info['anxiety_features'] = [
-            "Gender", "Age", "numbness", "wobbliness", "afraidofworsthappening",
-            "heartpounding", "unsteadyorunstable", "terrified", "handstrembling",
-            "shakystate", "difficultyinbreathing", "scared", "hotorcoldsweats", "faceflushed"
-        ]
-
-        # Depression Model
-        features_info['depression_features'] = "21 BDI questionnaire responses"
-
-        print(f"📤 Returning features info with {len(features_info)} categories")
-        return jsonify(features_info)
-
-    except Exception as e:
-        print(f"❌ ERROR in features endpoint: {str(e)}")
-        print(traceback.format_exc())
-        return jsonify({'error': str(e)})
+    response = Response(FEATURES_BODY, mimetype="application/json")
+    response.set_etag(FEATURES_ETAG)
+    print(f"📤 Returning features info with {len(FEATURES_INFO)} categories")
+    return response.make_conditional(request)
 
 # ---------------- Stress Prediction ----------------
 @app.route('/predict_stress', methods=['POST'])
@@ -230,36 +364,17 @@ def predict_stress():
     print("\n" + "="*50)
     print("😰 STRESS PREDICTION ENDPOINT CALLED")
     print("="*50)
+    print("📥 Getting request data...")
+    _, input_row = parse_request(STRESS_SCHEMA)
     try:
         print("🔍 Checking stress model availability...")
         if stress_model is None or stress_scaler is None:
             print("❌ Stress model not loaded")
             return jsonify({'error': 'Stress model not loaded'}), 500
 
-        print("📥 Getting request data...")
-        data = request.get_json()
-        print(f"📦 Received data: {data}")
-        
-        if not data:
-            print("❌ No JSON data received")
-            return jsonify({'error': 'No JSON data received'}), 400
-
-        features = [
-            'anxiety_level', 'self_esteem', 'mental_health_history', 'depression', 
-            'headache', 'blood_pressure', 'sleep_quality', 'breathing_problem', 
-            'noise_level', 'living_conditions', 'safety', 'basic_needs', 
-            'academic_performance', 'study_load', 'teacher_student_relationship', 
-            'future_career_concerns', 'social_support', 'peer_pressure', 
-            'extracurricular_activities', 'bullying'
-        ]
-        
-        print(f"🔧 Processing {len(features)} features...")
-        input_data = [float(data[feature]) for feature in features]
-        print(f"📊 Input data prepared: {input_data}")
-        
-        input_df = pd.DataFrame([input_data], columns=features)
-        print("📈 Dataframe created")
+        print(f"📊 Input data prepared: {input_row.tolist()}")
         
+        input_df = pd.DataFrame(input_row, columns=STRESS_SCHEMA.fields)
         input_scaled = stress_scaler.transform(input_df)
         print("⚖️ Data scaled")
         
@@ -268,22 +383,14 @@ def predict_stress():
         print(f"🎯 Raw prediction: {prediction}")
         
         predicted_class = int(np.argmax(prediction, axis=1)[0])
-        confidence = float(np.max(prediction)) * 100
+        percentages = np.round(prediction[0] * 100, 2)
         
-        stress_levels = {
-            0: 'Low Stress',
-            1: 'Medium Stress',
-            2: 'High Stress'
-        }
+        stress_levels = ['Low Stress', 'Medium Stress', 'High Stress']
         
         result = {
             'stress_level': stress_levels[predicted_class],
-            'confidence': float(round(confidence, 2)),
-            'details': {
-                'Low Stress': float(round(prediction[0][0] * 100, 2)),
-                'Medium Stress': float(round(prediction[0][1] * 100, 2)),
-                'High Stress': float(round(prediction[0][2] * 100, 2))
-            }
+            'confidence': percentages[predicted_class],
+            'details': dict(zip(stress_levels, percentages))
         }
         
         print(f"📤 Returning result: {result}")
@@ -300,50 +407,18 @@ def predict_suggestion():
     print("\n" + "="*50)
     print("💡 SUGGESTION PREDICTION ENDPOINT CALLED")
     print("="*50)
+    print("📥 Getting request data...")
+    _, input_row = parse_request(SUGGESTION_SCHEMA)
+    print("✅ All required fields present")
     try:
         print("🔍 Checking suggestion model availability...")
         if suggestion_model is None or label_encoder is None:
             print("❌ Suggestion model not loaded")
             return jsonify({'error': 'Suggestion model not loaded'}), 500
 
-        print("📥 Getting request data...")
-        data = request.get_json()
-        print(f"📦 Received data: {data}")
-        
-        if not data:
-            print("❌ No JSON data received")
-            return jsonify({'error': 'No JSON data received'}), 400
-
-        required_fields = [
-            'depression_level', 'stress_level', 'anxiety_level',
-            'age', 'gender', 'relationship', 'living_situation'
-        ]
-        
-        print(f"🔍 Checking required fields: {required_fields}")
-        for field in required_fields:
-            if field not in data:
-                print(f"❌ Missing field: {field}")
-                return jsonify({
-                    'status': 'error',
-                    'message': f'Missing required field: {field}'
-                }), 400
-
-        print("✅ All required fields present")
-        # Create DataFrame with proper feature names
-        input_data = pd.DataFrame([[
-            int(data['depression_level']),
-            int(data['stress_level']),
-            int(data['anxiety_level']),
-            int(data['age']),
-            int(data['gender']),
-            int(data['relationship']),
-            int(data['living_situation'])
-        ]], columns=[
-            'depression_level', 'stress_level', 'anxiety_level',
-            'age', 'gender', 'relationship', 'living_situation'
-        ])
-        
-        print(f"📊 Input dataframe: {input_data.values.tolist()}")
+        # Keep feature names so the model sees the columns it was fitted on
+        input_data = pd.DataFrame(input_row, columns=SUGGESTION_SCHEMA.fields)
+        print(f"📊 Input dataframe: {input_row.tolist()}")
         
         print("🤖 Making prediction...")
         encoded_prediction = suggestion_model.predict(input_data)
@@ -389,36 +464,21 @@ def predict_depression():
     print("\n" + "="*50)
     print("😔 DEPRESSION PREDICTION ENDPOINT CALLED")
     print("="*50)
-    try:
-        print("🔍 Checking depression model availability...")
-        if depression_model is None:
-            print("❌ Depression model not loaded")
-            return jsonify({'error': 'Depression model not loaded'}), 500
-
-        print("📥 Getting request data...")
-        data = request.get_json()
-        print(f"📦 Received data: {data}")
-        
-        if not data:
-            print("❌ No JSON data received")
-            return jsonify({"error": "No JSON data received"}), 400
+    print("📥 Getting request data...")
+    data, responses = parse_request(DEPRESSION_SCHEMA)
+    print(f"📋 Responses received: {responses.tolist()}")
 
-        responses = data.get("responses")
-        print(f"📋 Responses received: {responses}")
-        
-        if not responses or len(responses) != 21:
-            print(f"❌ Invalid responses length: {len(responses) if responses else 0}")
-            return jsonify({"error": "Expected 21 responses."}), 400
-
-        print("🔧 Preparing input data...")
-        input_array = np.array([responses])
-        print(f"📊 Input array shape: {input_array.shape}")
-        
-        print("🤖 Making prediction...")
-        prediction = depression_model.predict(input_array)[0][0]
-        print(f"🎯 Raw prediction: {prediction}")
+    if "mode" in data:
+        mode = data["mode"]
+    else:
+        mode = request.args.get("mode", DEPRESSION_SCORING_MODE)
+    mode = mode.lower() if isinstance(mode, str) else mode
+    print(f"⚙️ Scoring mode: {mode}")
+    if mode not in DEPRESSION_SCORING_MODES:
+        raise RequestValidationError(f"Invalid mode. Expected one of: {', '.join(DEPRESSION_SCORING_MODES)}")
 
-        bdi_score = sum(responses)
+    try:
+        bdi_score = responses.sum()
         print(f"📊 BDI Score calculated: {bdi_score}")
         
         depression_level = interpret_depression_score(bdi_score)
@@ -426,9 +486,27 @@ def predict_depression():
 
         response = {
             "depression_level": depression_level,
-            "bdi_score": bdi_score
+            "bdi_score": bdi_score,
+            "scoring_mode": mode
         }
-        
+
+        if mode == "model":
+            print("🔍 Checking depression model availability...")
+            if depression_model is None or depression_scaler is None:
+                print("❌ Depression model not loaded")
+                return jsonify({'error': 'Depression model not loaded'}), 500
+
+            print("🔧 Preparing input data...")
+            input_scaled = depression_scaler.transform(responses.astype(np.float32))
+            print(f"📊 Scaled input shape: {input_scaled.shape}")
+
+            # Direct call avoids the per-call setup cost of model.predict() for a single row
+            print("🤖 Making prediction...")
+            prediction = depression_model(input_scaled, training=False).numpy()[0][0]
+            print(f"🎯 Raw prediction: {prediction}")
+
+            response["model_score"] = np.round(prediction, 4)
+
         print(f"📤 Returning response: {response}")
         return jsonify(response)
 
@@ -443,38 +521,17 @@ def predict_anxiety():
     print("\n" + "="*50)
     print("😰 ANXIETY PREDICTION ENDPOINT CALLED")
     print("="*50)
+    print("📥 Getting request data...")
+    _, feature_values = parse_request(ANXIETY_SCHEMA)
+    print(f"📊 Feature values: {feature_values.tolist()}")
     try:
         print("🔍 Checking anxiety model availability...")
         if anxiety_model is None:
             print("❌ Anxiety model not loaded")
             return jsonify({'error': 'Anxiety model not loaded'}), 500
 
-        print("📥 Getting request data...")
-        data = request.get_json()
-        print(f"📦 Received data: {data}")
-        
-        if not data:
-            print("❌ No JSON data received")
-            return jsonify({"error": "No JSON data received"}), 400
-
-        features = [
-            'Gender', 'Age', 'numbness', 'wobbliness', 'afraidofworsthappening',
-            'heartpounding', 'unsteadyorunstable', 'terrified', 'handstrembling',
-            'shakystate', 'difficultyinbreathing', 'scared', 'hotorcoldsweats', 'faceflushed'
-        ]
-        
-        print(f"🔍 Extracting {len(features)} features...")
-        feature_values = []
-        for feature in features:
-            if feature not in data:
-                print(f"❌ Missing feature: {feature}")
-                return jsonify({"error": f"Missing feature: {feature}"}), 400
-            feature_values.append(data[feature])
-        
-        print(f"📊 Feature values: {feature_values}")
-
         print("🤖 Making prediction...")
-        prediction = anxiety_model.predict([feature_values])[0]
+        prediction = anxiety_model.predict(feature_values)[0]
         print(f"🎯 Raw prediction: {prediction}")
 
         response = {'predicted_anxiety_level': int(prediction)}
@@ -626,6 +683,16 @@ def predict_face_expression():
         print("="*60 + "\n")
         return jsonify({"error": str(e)}), 500
 
+# Schema validation failures are always a 400 with the same shape
+@app.errorhandler(RequestValidationError)
+def handle_validation_error(e):
+    print(f"❌ Invalid request: {str(e)}")
+    return jsonify({
+        'status': 'error',
+        'message': str(e),
+        'error': str(e)
+    }), 400
+
 # Add global error handler
 @app.errorhandler(Exception)
 def handle_exception(e):
@@ -0,0 +1,56 @@
+import time
+import random
+import statistics
+import contextlib
+import io
+
+ITERATIONS = 200
+WARMUP = 10
+
+def time_requests(client, payload, extra=None):
+    timings = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(WARMUP + ITERATIONS):
+            start = time.perf_counter()
+            result = client.post("/predict_depression", json=payload)
+            if extra is not None:
+                extra()
+            elapsed = (time.perf_counter() - start) * 1000
+            if result.status_code != 200:
+                raise RuntimeError(f"{payload['mode']} mode failed: {result.get_json()}")
+            if i >= WARMUP:
+                timings.append(elapsed)
+    return timings
+
+def main():
+    import numpy as np
+
+    # Importing app loads every model once, same as the server start
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app
+
+    client = app.app.test_client()
+    responses = [random.randint(0, 3) for _ in range(21)]
+    input_array = np.array([responses])
+
+    results = {
+        # Old handler: the rule-based response plus a discarded model.predict() call
+        "baseline": time_requests(client, {"responses": responses, "mode": "rule"},
+                                  lambda: app.depression_model.predict(input_array)),
+        "rule": time_requests(client, {"responses": responses, "mode": "rule"}),
+        "model": time_requests(client, {"responses": responses, "mode": "model"}),
+    }
+
+    print(f"\n📊 /predict_depression latency over {ITERATIONS} requests")
+    for mode, timings in results.items():
+        timings.sort()
+        print(f"   - {mode:8s}: mean {statistics.mean(timings):7.3f} ms | "
+              f"p50 {timings[len(timings) // 2]:7.3f} ms | "
+              f"p95 {timings[int(len(timings) * 0.95)]:7.3f} ms")
+
+    baseline = statistics.mean(results["baseline"])
+    print(f"✅ Rule mode saves {baseline - statistics.mean(results['rule']):.3f} ms per request vs baseline")
+    print(f"✅ Model mode saves {baseline - statistics.mean(results['model']):.3f} ms per request vs baseline")
+
+if __name__ == "__main__":
+    main()
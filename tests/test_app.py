@@ -0,0 +1,226 @@
+import numpy as np
+import orjson
+import pytest
+
+import app as vibecare
+
+
+@pytest.fixture
+def client():
+    return vibecare.app.test_client()
+
+
+def anxiety_payload(**overrides):
+    payload = {feature: 1 for feature in vibecare.ANXIETY_FEATURES}
+    payload.update(overrides)
+    return payload
+
+
+def suggestion_payload(**overrides):
+    payload = {feature: 1 for feature in vibecare.SUGGESTION_FEATURES}
+    payload.update(overrides)
+    return payload
+
+
+# ---------------------- Schemas ----------------------
+def test_feature_schema_coerces_to_typed_row():
+    row = vibecare.STRESS_SCHEMA.parse({f: str(i) for i, f in enumerate(vibecare.STRESS_FEATURES)})
+    assert row.shape == (1, len(vibecare.STRESS_FEATURES))
+    assert row.dtype == np.float64
+    assert row[0, 3] == 3.0
+
+
+@pytest.mark.parametrize("schema, payload, message", [
+    (vibecare.ANXIETY_SCHEMA, {}, "Missing required field: Gender"),
+    (vibecare.ANXIETY_SCHEMA, anxiety_payload(Age="abc"), "Invalid value for field: Age"),
+    (vibecare.ANXIETY_SCHEMA, anxiety_payload(Age=None), "Invalid value for field: Age"),
+    (vibecare.ANXIETY_SCHEMA, anxiety_payload(Age="nan"), "Invalid value for field: Age"),
+    (vibecare.ANXIETY_SCHEMA, anxiety_payload(scared="inf"), "Invalid value for field: scared"),
+    (vibecare.ANXIETY_SCHEMA, anxiety_payload(scared="-inf"), "Invalid value for field: scared"),
+    (vibecare.ANXIETY_SCHEMA, anxiety_payload(scared=True), "Invalid value for field: scared"),
+    (vibecare.SUGGESTION_SCHEMA, suggestion_payload(gender=1.7), "Invalid value for field: gender"),
+    (vibecare.SUGGESTION_SCHEMA, suggestion_payload(gender="1.7"), "Invalid value for field: gender"),
+    (vibecare.SUGGESTION_SCHEMA, suggestion_payload(gender=True), "Invalid value for field: gender"),
+    (vibecare.SUGGESTION_SCHEMA, suggestion_payload(gender=float("inf")), "Invalid value for field: gender"),
+    (vibecare.SUGGESTION_SCHEMA, suggestion_payload(gender=[1]), "Invalid value for field: gender"),
+])
+def test_feature_schema_rejects_invalid_payloads(schema, payload, message):
+    with pytest.raises(vibecare.RequestValidationError, match=message):
+        schema.parse(payload)
+
+
+def test_integer_feature_schema_accepts_whole_numbers():
+    row = vibecare.SUGGESTION_SCHEMA.parse(suggestion_payload(gender="2", relationship=3.0))
+    assert row.dtype == np.int64
+    assert row[0, vibecare.SUGGESTION_FEATURES.index("gender")] == 2
+    assert row[0, vibecare.SUGGESTION_FEATURES.index("relationship")] == 3
+
+
+def test_sequence_schema_parses_bdi_responses():
+    row = vibecare.DEPRESSION_SCHEMA.parse({"responses": [0, 1, 2, 3] * 5 + [3]})
+    assert row.shape == (1, 21)
+    assert row.sum() == 33
+
+
+@pytest.mark.parametrize("responses", [
+    [1] * 20,
+    [2.9] * 21,
+    [0.9] * 21,
+    ["3"] * 21,
+    [True] * 21,
+    [1] * 20 + [4],
+    [1] * 20 + [-1],
+    "1" * 21,
+])
+def test_sequence_schema_rejects_invalid_responses(responses):
+    with pytest.raises(vibecare.RequestValidationError):
+        vibecare.DEPRESSION_SCHEMA.parse({"responses": responses})
+
+
+# ---------------------- JSON ----------------------
+def test_json_provider_serializes_numpy_scalars():
+    with vibecare.app.app_context():
+        response = vibecare.jsonify({
+            "f32": np.float32(12.5),
+            "i64": np.int64(42),
+            "row": np.array([1.5, 2.5])
+        })
+    assert orjson.loads(response.get_data()) == {"f32": 12.5, "i64": 42, "row": [1.5, 2.5]}
+
+
+def test_json_provider_sorts_keys_like_flask_default():
+    body = {"b": 1, "a": {"d": 2, "c": 3}}
+    with vibecare.app.app_context():
+        response = vibecare.jsonify(body)
+    assert response.get_data() == b'{"a":{"c":3,"d":2},"b":1}'
+    assert vibecare.app.json.dumps(body) == '{"a":{"c":3,"d":2},"b":1}'
+
+
+def test_json_provider_rejects_unsupported_options():
+    with pytest.raises(TypeError, match="indent"):
+        vibecare.app.json.dumps({}, indent=2)
+    with pytest.raises(TypeError, match="parse_float"):
+        vibecare.app.json.loads("{}", parse_float=float)
+
+
+# ---------------------- Routes ----------------------
+@pytest.mark.parametrize("endpoint, payload", [
+    ("/predict_stress", {"anxiety_level": 1}),
+    ("/predict_suggestion", {"depression_level": 1}),
+    ("/predict_suggestion", suggestion_payload(gender=1.7)),
+    ("/predict_anxiety", anxiety_payload(Age="nan")),
+    ("/predict_depression", {"responses": [2.9] * 21}),
+    ("/predict_depression", {"responses": [1] * 21, "mode": 0}),
+    ("/predict_depression", {"responses": [1] * 21, "mode": "bogus"}),
+])
+def test_invalid_requests_return_shared_400_body(client, endpoint, payload):
+    response = client.post(endpoint, json=payload)
+    assert response.status_code == 400
+    body = response.get_json()
+    assert body["status"] == "error"
+    assert body["message"] == body["error"]
+
+
+def test_missing_body_returns_400(client):
+    response = client.post("/predict_anxiety", data="", content_type="application/json")
+    assert response.status_code == 400
+    assert response.get_json()["message"] == "No JSON data received"
+
+
+def test_depression_rule_mode(client):
+    response = client.post("/predict_depression", json={"responses": [1] * 21, "mode": "rule"})
+    assert response.status_code == 200
+    assert response.get_json() == {
+        "depression_level": "Moderate depression",
+        "bdi_score": 21,
+        "scoring_mode": "rule"
+    }
+
+
+def test_features_served_with_etag(client):
+    response = client.get("/features")
+    assert response.status_code == 200
+    assert response.get_json() == vibecare.FEATURES_INFO
+    etag = response.headers["ETag"]
+
+    cached = client.get("/features", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.get_data() == b""
+
+
+def test_features_body_keeps_sorted_key_order(client):
+    assert list(orjson.loads(client.get("/features").get_data())) == sorted(vibecare.FEATURES_INFO)
+
+
+# ---------------------- Depression scoring modes ----------------------
+class ExplodingModel:
+    def __call__(self, *args, **kwargs):
+        raise AssertionError("rule mode must not call the depression model")
+
+    predict = __call__
+    transform = __call__
+
+
+def test_depression_rule_mode_never_calls_model(client, monkeypatch):
+    monkeypatch.setattr(vibecare, "depression_model", ExplodingModel())
+    monkeypatch.setattr(vibecare, "depression_scaler", ExplodingModel())
+    response = client.post("/predict_depression", json={"responses": [3] * 21, "mode": "rule"})
+    assert response.status_code == 200
+    assert response.get_json() == {
+        "depression_level": "Extreme depression",
+        "bdi_score": 63,
+        "scoring_mode": "rule"
+    }
+
+
+@pytest.mark.parametrize("answer, expected", [(0, 0.0), (3, 63.8)])
+def test_depression_model_mode_tracks_bdi_sum(client, answer, expected):
+    response = client.post("/predict_depression", json={"responses": [answer] * 21, "mode": "model"})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["scoring_mode"] == "model"
+    assert body["bdi_score"] == answer * 21
+    assert body["model_score"] == pytest.approx(expected, abs=1.0)
+
+
+def test_depression_mode_from_query_string(client):
+    response = client.post("/predict_depression?mode=model", json={"responses": [1] * 21})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["scoring_mode"] == "model"
+    assert "model_score" in body
+
+
+def test_depression_body_mode_overrides_query_string(client):
+    response = client.post("/predict_depression?mode=model", json={"responses": [1] * 21, "mode": "rule"})
+    assert response.status_code == 200
+    assert "model_score" not in response.get_json()
+
+
+def test_depression_configured_default_mode(client, monkeypatch):
+    monkeypatch.setattr(vibecare, "DEPRESSION_SCORING_MODE", "model")
+    response = client.post("/predict_depression", json={"responses": [1] * 21})
+    assert response.status_code == 200
+    assert response.get_json()["scoring_mode"] == "model"
+
+
+@pytest.mark.parametrize("env, expected", [
+    (None, "rule"),
+    ("model", "model"),
+    ("MODEL", "model"),
+    ("bogus", "rule"),
+])
+def test_read_depression_scoring_mode_from_env(monkeypatch, env, expected):
+    if env is None:
+        monkeypatch.delenv("DEPRESSION_SCORING_MODE", raising=False)
+    else:
+        monkeypatch.setenv("DEPRESSION_SCORING_MODE", env)
+    assert vibecare.read_depression_scoring_mode() == expected
+
+
+@pytest.mark.parametrize("missing", ["depression_model", "depression_scaler"])
+def test_depression_model_mode_without_artifacts_returns_500(client, monkeypatch, missing):
+    monkeypatch.setattr(vibecare, missing, None)
+    response = client.post("/predict_depression", json={"responses": [1] * 21, "mode": "model"})
+    assert response.status_code == 500
+    assert response.get_json() == {"error": "Depression model not loaded"}